@@ -16,6 +16,17 @@ from utils.download import download
 from utils import get_logger
 import scraper
 
+# Enforce library restrictions (academic requirement) once at import
+# time rather than re-reading and scanning scraper's source for every
+# worker thread constructed
+_SCRAPER_SRC = getsource(scraper)
+assert all(
+    _SCRAPER_SRC.find(req) == -1
+    for req in ("from requests import", "import requests",
+                "from urllib.request import", "import urllib.request")), \
+    "Do not use requests or urllib.request in scraper.py"
+del _SCRAPER_SRC
+
 
 class Worker(Thread):
     """
@@ -34,20 +45,11 @@ class Worker(Thread):
             worker_id: Unique identifier for logging
             config: Configuration object
             frontier: Shared frontier instance for URL management
-
-        Raises:
-            AssertionError: If scraper.py uses forbidden libraries
         """
         self.logger = get_logger(f"Worker-{worker_id}", "Worker")
         self.config = config
         self.frontier = frontier
 
-        # Enforce library restrictions (academic requirement)
-        assert {getsource(scraper).find(req) for req in {"from requests import", "import requests"}} == {-1}, \
-            "Do not use requests in scraper.py"
-        assert {getsource(scraper).find(req) for req in {"from urllib.request import", "import urllib.request"}} == {-1}, \
-            "Do not use urllib.request in scraper.py"
-
         super().__init__(daemon=True)
         
     def run(self):
@@ -66,13 +68,15 @@ class Worker(Thread):
         domains that haven't been accessed within the delay period.
         """
         while True:
-            tbd_url = self.frontier.get_tbd_url()
+            tbd_url, wait_time = self.frontier.get_tbd_url()
 
             if not tbd_url:
                 # No URL available - check reason
                 if self.frontier.has_pending_urls():
-                    # URLs exist but all domains are in politeness cooldown
-                    time.sleep(0.1)
+                    # Sleep exactly until the earliest domain leaves its
+                    # politeness cooldown, or briefly when waiting on
+                    # in-flight downloads to discover new URLs
+                    time.sleep(wait_time if wait_time else 0.05)
                     continue
                 else:
                     # Frontier exhausted - shutdown
@@ -88,9 +92,8 @@ class Worker(Thread):
             # Extract and validate links
             scraped_urls = scraper.scraper(tbd_url, resp)
 
-            # Add discovered URLs to frontier
-            for scraped_url in scraped_urls:
-                self.frontier.add_url(scraped_url)
+            # Add discovered URLs to frontier in one batch
+            self.frontier.add_urls(scraped_urls)
 
             # Mark completion (decrements active download counter)
             self.frontier.mark_url_complete(tbd_url)
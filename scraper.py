@@ -13,15 +13,20 @@ Main entry point: scraper(url, resp) returns list of valid URLs to crawl next
 import re
 import json
 import sys
+import time
+import queue
 import atexit
 import signal
+import threading
 from datetime import datetime
-from threading import Lock
+from functools import lru_cache
 from collections import Counter, defaultdict
-from urllib.parse import urlparse, urljoin, urldefrag
+from urllib.parse import urlsplit, urljoin, urldefrag
 
 from bs4 import BeautifulSoup
 
+from utils import FastRLock
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -33,6 +38,13 @@ ALLOWED_DOMAINS = [
     ".stat.uci.edu",
 ]
 
+# Precomputed forms of ALLOWED_DOMAINS for is_valid's hot path: an O(1)
+# frozenset probe for bare-domain hosts and a single C-level
+# endswith(tuple) for subdomains, instead of a per-call generator that
+# lstrips every entry.
+_ALLOWED_EXACT = frozenset(d.lstrip(".") for d in ALLOWED_DOMAINS)
+_ALLOWED_SUFFIXES = tuple(ALLOWED_DOMAINS)
+
 # English stopwords from https://www.ranks.nl/stopwords
 STOP_WORDS = {
     "a", "about", "above", "after", "again", "against", "all", "am", "an", "and", "any",
@@ -63,37 +75,104 @@ JUNK_WORDS = {
     "www", "nbsp", "amp", "quot", "lt", "gt",
 }
 
+# Combined skip set: one frozenset membership test per token instead of
+# two separate lookups. frozenset hashing is marginally cheaper and the
+# union is built once at import.
+_SKIP_WORDS = frozenset(STOP_WORDS) | frozenset(JUNK_WORDS)
+
 # ============================================================================
 # GLOBAL STATISTICS (Thread-Safe)
 # ============================================================================
 
 # Analytics data structures
 unique_pages: set[str] = set()
-word_counts: Counter[str] = Counter()
 longest_page = ("", 0)  # (url, word_count)
 subdomain_pages: defaultdict[str, set[str]] = defaultdict(set)
 pages_processed = 0  # Counter for periodic saves
 
-# Thread synchronization locks
-stats_lock = Lock()  # Protects all analytics data structures
-log_lock = Lock()    # Protects log file writes
+# Thread synchronization locks (C-implemented when fastrlock is
+# available). Single set.add / defaultdict-getitem / len operations are
+# already atomic under CPython's GIL, so unique_pages and
+# subdomain_pages need no locking at all; only genuine
+# read-modify-write sequences keep a lock.
+_longest_lock = FastRLock()  # Protects the longest_page compare-and-swap
+_pages_lock = FastRLock()    # Protects the pages_processed save counter
+log_lock = FastRLock()       # Protects log file writes
+
+# Word frequencies are sharded per updating thread so the per-word
+# update loop never contends on the global stats lock: each thread owns
+# a (lock, Counter) shard (the lock is uncontended except while a
+# report merges the shards). With the background analytics consumer
+# there is normally just one shard, but the machinery stays - it is
+# what lets a report thread snapshot the counts safely mid-update.
+_tls = threading.local()
+_word_count_shards: list[tuple] = []  # [(lock, Counter), ...]
+_shards_lock = FastRLock()  # Protects the shard list itself
+
+
+def _local_word_counts():
+    """
+    Get this thread's word-count shard, creating it on first use.
+
+    Returns:
+        (lock, Counter) tuple owned by the calling thread
+    """
+    shard = getattr(_tls, "word_counts", None)
+    if shard is None:
+        shard = _tls.word_counts = (FastRLock(), Counter())
+        with _shards_lock:
+            _word_count_shards.append(shard)
+    return shard
+
+
+def _merged_word_counts():
+    """
+    Merge every thread's word-count shard into one Counter.
+
+    Only called at report time; takes each shard's lock briefly so a
+    concurrently updating worker can't corrupt the merge.
+
+    Returns:
+        Counter with the summed frequencies across all threads
+    """
+    with _shards_lock:
+        shards = list(_word_count_shards)
+    merged: Counter[str] = Counter()
+    for shard_lock, counter in shards:
+        with shard_lock:
+            merged.update(counter)
+    return merged
 
 # Crash recovery: save report every N pages
 SAVE_INTERVAL = 50  # Periodic save frequency (balances I/O vs. data loss)
 
-# Initialize crawl activity log
+# Initialize crawl activity log. The file handle stays open for the
+# whole crawl with the default block buffer, so logging a page is an
+# in-memory copy; _log_crawl flushes every _LOG_FLUSH_EVERY entries to
+# bound how much a crash can lose without paying a write syscall per
+# page.
 CRAWL_LOG_FILE = "crawl_log.txt"
+_LOG_FLUSH_EVERY = 100
+_log_lines = 0  # Entries since the last flush (guarded by log_lock)
 try:
-    with open(CRAWL_LOG_FILE, "w", encoding="utf-8") as f:
-        f.write(f"Crawl started at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write("=" * 80 + "\n\n")
+    _LOG_FH = open(CRAWL_LOG_FILE, "w", encoding="utf-8")
+    _LOG_FH.write(f"Crawl started at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    _LOG_FH.write("=" * 80 + "\n\n")
+    _LOG_FH.flush()
+    atexit.register(_LOG_FH.close)
 except Exception:
-    pass
+    _LOG_FH = None
 
 # ============================================================================
 # LOGGING AND REPORTING
 # ============================================================================
 
+# Timestamp cache for _log_crawl: the log has one-second resolution, so
+# the formatted string is reused until the clock ticks over instead of
+# paying a datetime allocation and strftime parse per logged page.
+_ts_cache = [0, ""]  # [epoch_second, formatted "%H:%M:%S"]
+
+
 def _log_crawl(url, word_count, subdomain):
     """
     Log a crawl event to the activity log file (thread-safe).
@@ -103,14 +182,26 @@ def _log_crawl(url, word_count, subdomain):
         word_count: Number of words found on the page
         subdomain: The subdomain of the URL
     """
+    global _log_lines
+    if _LOG_FH is None:
+        return
     try:
+        # Format the whole message before taking log_lock so the lock
+        # only covers the single buffered write
+        now = int(time.time())
+        if now != _ts_cache[0]:
+            _ts_cache[1] = time.strftime("%H:%M:%S", time.localtime(now))
+            _ts_cache[0] = now
+        timestamp = _ts_cache[1]
+        page_count = len(unique_pages)  # len is GIL-atomic
+        msg = (f"[{timestamp}] Pages: {page_count} | "
+               f"Words: {word_count} | {subdomain}\n  {url}\n\n")
         with log_lock:
-            with open(CRAWL_LOG_FILE, "a", encoding="utf-8") as f:
-                timestamp = datetime.now().strftime("%H:%M:%S")
-                with stats_lock:
-                    page_count = len(unique_pages)
-                f.write(f"[{timestamp}] Pages: {page_count} | Words: {word_count} | {subdomain}\n")
-                f.write(f"  {url}\n\n")
+            _LOG_FH.write(msg)
+            _log_lines += 1
+            if _log_lines >= _LOG_FLUSH_EVERY:
+                _log_lines = 0
+                _LOG_FH.flush()
     except Exception:
         pass
 
@@ -134,29 +225,40 @@ def _save_report(final=False):
         - Subdomain distribution
     """
     try:
-        # Atomically read all statistics
-        with stats_lock:
-            unique_count = len(unique_pages)
+        # Snapshot the statistics; list(dict.items()) and len are single
+        # C calls and therefore safe against concurrent GIL-atomic
+        # writers. Word counts are merged from the per-thread shards.
+        unique_count = len(unique_pages)
+        with _longest_lock:
             longest_url, longest_count = longest_page
-            top_words = word_counts.most_common(50)
-            subdomain_counts = {sub: len(urls) for sub, urls in subdomain_pages.items()}
-
-        # Print to console only on final save
+        subdomain_counts = {
+            sub: len(urls) for sub, urls in list(subdomain_pages.items())}
+        # Sort once; the console, JSON and text outputs all reuse this
+        sorted_subdomains = sorted(subdomain_counts.items())
+        top_words = _merged_word_counts().most_common(50)
+
+        # Print to console only on final save. Build the whole report as
+        # one string and write it in a single call instead of one
+        # print()/flush per line.
         if final:
-            print("\n" + "=" * 50)
-            print("FINAL CRAWL ANALYTICS")
-            print("=" * 50)
-            print(f"Unique pages: {unique_count}")
-            print(f"Longest page: {longest_url}")
-            print(f"Longest page word count: {longest_count}")
-
-            print("\nTop 50 words (stopwords removed):")
-            for word, count in top_words:
-                print(f"  {word}\t{count}")
-
-            print(f"\nSubdomains ({len(subdomain_counts)} total, alphabetical):")
-            for subdomain in sorted(subdomain_counts.keys()):
-                print(f"  {subdomain}, {subdomain_counts[subdomain]}")
+            lines = [
+                "",
+                "=" * 50,
+                "FINAL CRAWL ANALYTICS",
+                "=" * 50,
+                f"Unique pages: {unique_count}",
+                f"Longest page: {longest_url}",
+                f"Longest page word count: {longest_count}",
+                "",
+                "Top 50 words (stopwords removed):",
+            ]
+            lines.extend(f"  {word}\t{count}" for word, count in top_words)
+            lines.append(
+                f"\nSubdomains ({len(sorted_subdomains)} total, alphabetical):")
+            lines.extend(
+                f"  {subdomain}, {count}"
+                for subdomain, count in sorted_subdomains)
+            sys.stdout.write("\n".join(lines) + "\n")
 
         # Write structured JSON for programmatic access (crash recovery)
         try:
@@ -164,25 +266,32 @@ def _save_report(final=False):
                 "unique_pages_count": unique_count,
                 "longest_page": {"url": longest_url, "word_count": longest_count},
                 "top_50_words": top_words,
-                "subdomains": {sub: count for sub, count in sorted(subdomain_counts.items())},
+                "subdomains": dict(sorted_subdomains),
             }
             with open("report.json", "w") as f:
                 json.dump(data, f, indent=2)
         except Exception as e:
             print(f"Warning: Failed to write report.json: {e}")
 
-        # Write human-readable text report
+        # Write human-readable text report. One string, one write: each
+        # f.write takes the file object's internal lock, so the old
+        # per-line loops paid that cost 50+ times per save.
         try:
+            text_lines = [
+                f"Unique pages: {unique_count}",
+                f"Longest page: {longest_url}",
+                f"Longest page word count: {longest_count}",
+                "",
+                "Top 50 words (stopwords removed):",
+            ]
+            text_lines.extend(f"{word}\t{count}" for word, count in top_words)
+            text_lines.append(
+                "\nSubdomains (alphabetical) with unique page counts:")
+            text_lines.extend(
+                f"{subdomain}, {count}"
+                for subdomain, count in sorted_subdomains)
             with open("final_report_stats.txt", "w", encoding="utf-8") as f:
-                f.write(f"Unique pages: {unique_count}\n")
-                f.write(f"Longest page: {longest_url}\n")
-                f.write(f"Longest page word count: {longest_count}\n\n")
-                f.write("Top 50 words (stopwords removed):\n")
-                for word, count in top_words:
-                    f.write(f"{word}\t{count}\n")
-                f.write(f"\nSubdomains (alphabetical) with unique page counts:\n")
-                for subdomain in sorted(subdomain_counts.keys()):
-                    f.write(f"{subdomain}, {subdomain_counts[subdomain]}\n")
+                f.write("\n".join(text_lines) + "\n")
         except Exception as e:
             print(f"Warning: Failed to write final_report_stats.txt: {e}")
 
@@ -191,7 +300,8 @@ def _save_report(final=False):
 
 
 def _save_report_final():
-    """Wrapper for final save (prints to console)."""
+    """Wrapper for final save (drains queued stats, prints to console)."""
+    _drain_stats()
     _save_report(final=True)
 
 
@@ -209,6 +319,7 @@ def _handle_signal(signum, frame):
     Note: SIGKILL (kill -9) cannot be caught, hence periodic saves
     """
     print(f"\nReceived signal {signum}, saving report and exiting...")
+    _drain_stats()
     _save_report(final=True)
     sys.exit(0)
 
@@ -226,12 +337,18 @@ except AttributeError:
 # ============================================================================
 
 
+# Token pattern: runs of ASCII alphanumerics. Compiled once at module
+# scope so the sre engine does the whole scan in C.
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
+
+
 def _tokenize(text):
     """
     Tokenize text into lowercase alphanumeric words.
 
     Extracts contiguous sequences of ASCII alphanumeric characters,
-    converting them to lowercase.
+    converting them to lowercase. Non-ASCII characters act as token
+    separators.
 
     Args:
         text: Input text string
@@ -239,20 +356,10 @@ def _tokenize(text):
     Returns:
         List of lowercase alphanumeric tokens
 
-    Time Complexity: O(n) where n is the length of text
+    Time Complexity: O(n), one compiled-regex scan over the text plus a
+    C-level lower() per token
     """
-    tokens = []
-    current_token = ""
-    for char in text:
-        if char.isascii() and char.isalnum():
-            current_token += char.lower()
-        else:
-            if current_token:
-                tokens.append(current_token)
-                current_token = ""
-    if current_token:
-        tokens.append(current_token)
-    return tokens
+    return [token.lower() for token in _TOKEN_RE.findall(text)]
 
 
 def _compute_word_frequencies(tokens):
@@ -260,17 +367,51 @@ def _compute_word_frequencies(tokens):
     Count frequency of each token.
 
     Args:
-        tokens: List of string tokens
+        tokens: Iterable of string tokens
 
     Returns:
-        Dictionary mapping token to frequency count
+        Counter mapping token to frequency count (a dict subclass)
+
+    Time Complexity: O(n) where n is the number of tokens, counted in a
+    single C-level pass by Counter
+    """
+    return Counter(tokens)
+
+
+# Class/id attribute values that mark boilerplate sections
+_BOILERPLATE_RE = re.compile(
+    r"(menu|nav|footer|header|sidebar|breadcrumb|cookie|popup)", re.I
+)
+
+# Whitespace runs collapsed to single spaces in extracted text
+_WS_RE = re.compile(r"\s+")
+
+
+# Tag names that are boilerplate wherever they appear in the content
+_BOILER_TAGS = frozenset({"header", "footer", "nav", "aside"})
+
+
+def _is_boilerplate(tag):
+    """
+    Match tags that are boilerplate by name or by class/id attribute.
+
+    Used as a find_all predicate so one tree traversal covers the tag
+    name and both attributes.
+
+    Args:
+        tag: BeautifulSoup Tag to test
 
-    Time Complexity: O(n) where n is the number of tokens
+    Returns:
+        True if the tag is a structural boilerplate element or its
+        class list or id matches the boilerplate pattern
     """
-    frequencies = {}
-    for token in tokens:
-        frequencies[token] = frequencies.get(token, 0) + 1
-    return frequencies
+    if tag.name in _BOILER_TAGS:
+        return True
+    classes = tag.get("class")
+    if classes and _BOILERPLATE_RE.search(" ".join(classes)):
+        return True
+    tag_id = tag.get("id")
+    return bool(tag_id and _BOILERPLATE_RE.search(tag_id))
 
 
 def _extract_visible_text(soup):
@@ -291,43 +432,93 @@ def _extract_visible_text(soup):
                      "form", "meta", "link"]):
         tag.decompose()
 
-    # Attempt to locate main content container
-    main = None
-    for selector in ["main", "article", "#content", "#main",
-                     ".content", ".entry-content", ".post-content",
-                     ".page-content", ".site-content"]:
-        main = soup.select_one(selector)
-        if main:
-            break
+    # Attempt to locate main content container. One grouped selector
+    # means one tree traversal instead of up to nine; it returns the
+    # first match in document order rather than selector-priority
+    # order, which is an acceptable trade for boilerplate stripping.
+    main = soup.select_one(
+        "main, article, #content, #main, .content, .entry-content, "
+        ".post-content, .page-content, .site-content")
 
     if not main:
         main = soup.body or soup
 
-    # Remove boilerplate sections within the content container
-    for tag in main.find_all(["header", "footer", "nav", "aside"]):
-        tag.decompose()
-
-    # Remove elements with boilerplate-related class or id attributes
-    boilerplate_pattern = re.compile(
-        r"(menu|nav|footer|header|sidebar|breadcrumb|cookie|popup)", re.I
-    )
-    for node in main.find_all(attrs={"class": boilerplate_pattern}):
-        node.decompose()
-    for node in main.find_all(attrs={"id": boilerplate_pattern}):
-        node.decompose()
+    # Remove boilerplate sections within the content container: one
+    # traversal covers the structural tags (header/footer/nav/aside)
+    # and the class/id-matched elements. A node nested inside an
+    # already-removed match has been destroyed, so skip it.
+    for node in main.find_all(_is_boilerplate):
+        if not node.decomposed:
+            node.decompose()
 
     # Extract and normalize text
     text = main.get_text(separator=" ")
-    return re.sub(r"\s+", " ", text).strip()
+    return _WS_RE.sub(" ", text).strip()
 
 # ============================================================================
 # ANALYTICS COLLECTION
 # ============================================================================
 
 
+# Hand-off queue between the fetch threads and the analytics consumer.
+# The crawl is network-bound while analytics are CPU-bound; a single
+# background consumer overlaps the two and funnels all statistics
+# updates through one thread. Bounded so a slow consumer applies
+# backpressure instead of piling up unprocessed page text.
+_stats_q: queue.Queue = queue.Queue(maxsize=1024)
+
+
 def _record_stats(url, soup):
     """
-    Collect page analytics and update global statistics (thread-safe).
+    Queue page analytics for the background consumer (thread-safe).
+
+    Extracts the visible text on the calling thread (the soup is about
+    to be reused for link extraction, and text extraction mutates it)
+    and hands (url, text) to the analytics thread, so the fetch thread
+    never pays for tokenization or statistics bookkeeping.
+
+    Args:
+        url: Page URL
+        soup: BeautifulSoup parsed HTML
+    """
+    clean_url, _ = urldefrag(url)
+    text = _extract_visible_text(soup)
+    # Blocking put: when the queue is full the fetch thread waits
+    # briefly rather than silently dropping the page from the report
+    _stats_q.put((clean_url, text))
+
+
+def _stats_worker():
+    """
+    Background consumer loop: pop queued pages and record their stats.
+
+    Daemon thread; exceptions are swallowed per item so one bad page
+    can't kill analytics for the rest of the crawl.
+    """
+    while True:
+        clean_url, text = _stats_q.get()
+        try:
+            _process_stats(clean_url, text)
+        except Exception:
+            pass
+        finally:
+            _stats_q.task_done()
+
+
+def _drain_stats():
+    """Wait for queued pages to be processed before a final report."""
+    try:
+        _stats_q.join()
+    except Exception:
+        pass
+
+
+def _process_stats(clean_url, text):
+    """
+    Record one page's analytics into the global statistics.
+
+    Runs on the analytics consumer thread; the shard and lock
+    machinery keeps concurrent report snapshots safe.
 
     Tracks:
         - Unique pages visited
@@ -336,8 +527,8 @@ def _record_stats(url, soup):
         - Pages per subdomain
 
     Args:
-        url: Page URL
-        soup: BeautifulSoup parsed HTML
+        clean_url: Defragmented page URL
+        text: Visible page text from _extract_visible_text
 
     Filters:
         - Skips pages with < 50 tokens (low content)
@@ -351,49 +542,55 @@ def _record_stats(url, soup):
     """
     global longest_page, pages_processed
 
-    clean_url, _ = urldefrag(url)
+    # Low-content fast exit before any token scanning: 50 tokens need
+    # at least 50 characters plus 49 separators, so anything shorter
+    # than 99 characters can never pass the threshold below. len() is
+    # O(1); this skips the scan entirely for tiny/empty pages.
+    if len(text) < 99:
+        return
 
-    # Extract and tokenize visible content
-    text = _extract_visible_text(soup)
-    tokens = _tokenize(text)
+    # Tokenize, filter and count in a single fused pass: one traversal
+    # of the text, no intermediate token or filtered lists
+    page_freqs: Counter[str] = Counter()
+    total_word_count = 0
+    for match in _TOKEN_RE.finditer(text):
+        total_word_count += 1
+        token = match.group(0).lower()
+        if 2 <= len(token) <= 30 and token not in _SKIP_WORDS:
+            page_freqs[token] += 1
 
     # Skip low-content pages
-    if len(tokens) < 50:
+    if total_word_count < 50:
         return
 
     # Extract hostname for subdomain tracking
-    parsed = urlparse(clean_url)
-    hostname = (parsed.hostname or "").lower()
-
-    # Filter tokens: remove stopwords, junk, and extreme lengths
-    filtered = [
-        token for token in tokens
-        if 2 <= len(token) <= 30
-        and token not in STOP_WORDS
-        and token not in JUNK_WORDS
-    ]
-    page_freqs = _compute_word_frequencies(filtered)
-    total_word_count = len(tokens)
-
-    # Update global statistics atomically
-    should_save = False
-    with stats_lock:
-        unique_pages.add(clean_url)
+    hostname = (urlsplit(clean_url).hostname or "").lower()
+
+    # Accumulate word frequencies (per-page cap prevents dominance) into
+    # this thread's shard - no global lock on the O(words) loop
+    PER_PAGE_CAP = 10
+    shard_lock, local_counts = _local_word_counts()
+    with shard_lock:
+        for word, count in page_freqs.items():
+            local_counts[word] += min(count, PER_PAGE_CAP)
+
+    # Update remaining global statistics. set.add and the defaultdict
+    # subscript are single C-level operations, atomic under the GIL, so
+    # no locks are needed here.
+    unique_pages.add(clean_url)
 
-        # Track subdomain distribution
-        if hostname.endswith(".uci.edu") or hostname == "uci.edu":
-            subdomain_pages[hostname].add(clean_url)
+    # Track subdomain distribution
+    if hostname.endswith(".uci.edu") or hostname == "uci.edu":
+        subdomain_pages[hostname].add(clean_url)
 
-        # Update longest page
+    # Update longest page (read-then-write, so it needs its lock)
+    with _longest_lock:
         if total_word_count > longest_page[1]:
             longest_page = (clean_url, total_word_count)
 
-        # Accumulate word frequencies with per-page cap to prevent dominance
-        PER_PAGE_CAP = 10
-        for word, count in page_freqs.items():
-            word_counts[word] += min(count, PER_PAGE_CAP)
-
-        # Periodic save check (crash recovery)
+    # Periodic save check (crash recovery)
+    should_save = False
+    with _pages_lock:
         pages_processed += 1
         if pages_processed % SAVE_INTERVAL == 0:
             should_save = True
@@ -405,10 +602,22 @@ def _record_stats(url, soup):
     if should_save:
         _save_report(final=False)
 
+
+_stats_thread = threading.Thread(
+    target=_stats_worker, name="StatsWorker", daemon=True)
+_stats_thread.start()
+
 # ============================================================================
 # MAIN SCRAPER INTERFACE
 # ============================================================================
 
+# Byte-level href scanner for responses where analytics won't run: when
+# only the links matter there is no need to build a DOM at all. Stops
+# each match at quotes, whitespace or "#" (fragments are dropped
+# anyway); unquoted attribute values are rare enough to ignore, and
+# is_valid filters any junk the scan picks up.
+_HREF_RE = re.compile(rb'href\s*=\s*["\']([^"\'#\s]+)', re.I)
+
 
 def scraper(url, resp):
     """
@@ -460,16 +669,44 @@ def extract_next_links(url, resp):
     except Exception:
         pass
 
-    # Parse HTML
-    soup = BeautifulSoup(content, "lxml")
+    # Non-HTML payloads (JSON, PDFs, images) carry no anchor tags and
+    # any "links" lxml dug out of them would be dropped by is_valid
+    # anyway, so skip the parse entirely rather than feed libxml2 a
+    # potentially multi-MB binary body.
+    is_html = "text/html" in content_type or "xhtml" in content_type
+    if content_type and not is_html:
+        return []
+
     base_url = resp.raw_response.url if resp.raw_response.url else url
 
-    # Collect analytics for HTML pages only
-    if "text/html" in content_type:
-        _record_stats(base_url, soup)
+    # Missing Content-Type: analytics won't run, so skip the DOM build
+    # entirely and pull hrefs straight out of the raw bytes
+    if not is_html:
+        raw = content if isinstance(content, bytes) \
+            else content.encode("utf-8", "ignore")
+        links = []
+        seen = set()
+        for href in _HREF_RE.findall(raw):
+            href = href.decode("utf-8", "ignore").strip()
+            # Skip non-navigational hrefs
+            if not href or href.startswith(("javascript:", "mailto:", "tel:")):
+                continue
+            # Convert to absolute URL and remove fragment
+            absolute_url = urljoin(base_url, href)
+            absolute_url, _ = urldefrag(absolute_url)
+            # In-page dedup: nav/footer links repeat many times per page
+            if absolute_url not in seen:
+                seen.add(absolute_url)
+                links.append(absolute_url)
+        return links
+
+    # Declared HTML: full parse, analytics, then link extraction
+    soup = BeautifulSoup(content, "lxml")
+    _record_stats(base_url, soup)
 
     # Extract all anchor tag hrefs
     links = []
+    seen = set()
     for tag in soup.find_all("a", href=True):
         href = tag["href"].strip()
         # Skip non-navigational hrefs
@@ -478,7 +715,12 @@ def extract_next_links(url, resp):
         # Convert to absolute URL and remove fragment
         absolute_url = urljoin(base_url, href)
         absolute_url, _ = urldefrag(absolute_url)
-        links.append(absolute_url)
+        # In-page dedup: the same nav/footer link appears many times on
+        # a typical page; dropping repeats here saves an is_valid call
+        # and frontier work per duplicate
+        if absolute_url not in seen:
+            seen.add(absolute_url)
+            links.append(absolute_url)
 
     return links
 
@@ -486,11 +728,68 @@ def extract_next_links(url, resp):
 # URL VALIDATION
 # ============================================================================
 
-
+# Validation patterns compiled once at module scope; is_valid runs for
+# every link on every page, so per-call trips through re's compile cache
+# add up.
+#
+# Blocked file extensions as a frozenset: a single hash lookup on the
+# suffix replaces a ~60-way regex alternation over the path.
+_BAD_EXTS = frozenset({
+    # Web assets & images
+    "css", "js", "bmp", "gif", "jpg", "jpeg", "ico", "png", "tif", "tiff",
+    # Media
+    "mid", "mp2", "mp3", "mp4", "wav", "avi", "mov", "mpeg", "ram", "m4v",
+    "mkv", "ogg", "ogv",
+    # Documents
+    "pdf", "ps", "eps", "tex", "ppt", "pptx", "doc", "docx", "xls", "xlsx",
+    # Archives
+    "zip", "rar", "gz", "bz2", "tar", "7z", "tgz",
+    # Binaries
+    "exe", "msi", "bin", "dll", "dmg", "iso", "apk",
+    # Source code
+    "c", "cc", "cpp", "h", "hpp", "java", "py", "r", "m", "mat", "o",
+    # Data
+    "names", "data", "dat", "psd", "epub", "cnf", "sha1", "thmx", "mso",
+    "arff", "rtf", "jar", "csv",
+    # Misc
+    "rm", "smil", "wmv", "swf", "wma", "img", "sql", "ppsx", "odc", "war",
+    "db", "lif",
+    # "ova", "vmdk", "vdi", "qcow2",  # VM images
+})
+#
+# Trap substrings folded into single alternation patterns: one C-level
+# scan of the query (or path) instead of a dozen separate `in` probes
+# that each rescan the same string.
+_QUERY_TRAPS_RE = re.compile("|".join(map(re.escape, (
+    # WordPress comment/share links: infinite variations of same content
+    "replytocom=", "share=",
+    # oEmbed and XML format endpoints: return metadata, not HTML
+    "oembed", "format=xml",
+    # DokuWiki action parameters: combinatorial explosion
+    "do=media", "tab_files=", "tab_details=",
+    "do=revisions", "do=backlink", "do=recent", "do=index",
+    # WordPress faceted filtering: exponential URL combinations
+    "filter%5b", "filter[",
+))))
+_PATH_TRAPS_RE = re.compile(
+    # RSS/Atom feeds, sitemaps/XML, WP REST API, WP media uploads
+    r"/feed$|/feed/|\.xml$|/wp-json/|/wp-content/uploads/")
+_CALENDAR_WORD_RE = re.compile(r"(calendar|date|event)")
+_CALENDAR_DATE_RE = re.compile(r"\d{4}[-/]\d{2}")
+_APACHE_SORT_RE = re.compile(r"(^|[&;])(C|O)=")
+_AUTH_RE = re.compile(r"(login|logout|wp-admin|wp-login|action=)")
+
+
+@lru_cache(maxsize=200_000)
 def is_valid(url):
     """
     Validate whether a URL should be crawled.
 
+    Memoized on the URL string: nav/footer links recur on nearly every
+    page, so repeat validations are a cache hit instead of re-running
+    the parse and trap checks. Safe because validation is a pure
+    function of the URL.
+
     Checks:
         1. Protocol must be http or https
         2. Domain must be in ALLOWED_DOMAINS list
@@ -505,7 +804,20 @@ def is_valid(url):
         True if URL should be crawled, False otherwise
     """
     try:
-        parsed = urlparse(url)
+        # Checks are ordered cheapest-first so the common rejections
+        # cost an integer compare or a hash lookup, not a regex.
+
+        # Extremely long URLs: usually dynamically generated traps
+        # Legitimate content pages rarely exceed 200 characters
+        if len(url) > 200:
+            return False
+
+        # urlsplit skips urlparse's extra params handling; everything
+        # checked below (scheme, hostname, path, query) is on the
+        # SplitResult. Accepting a pre-parsed result instead was
+        # rejected: the lru_cache memoization keys on the URL string,
+        # so on a cache hit no parse happens at all.
+        parsed = urlsplit(url)
 
         # Only HTTP(S) protocols
         if parsed.scheme not in {"http", "https"}:
@@ -516,85 +828,45 @@ def is_valid(url):
             return False
 
         # Domain restriction: only crawl allowed UCI domains
-        if not any(
-            hostname == domain.lstrip(".")
-            or hostname.endswith(domain)
-            for domain in ALLOWED_DOMAINS
-        ):
+        if hostname not in _ALLOWED_EXACT \
+                and not hostname.endswith(_ALLOWED_SUFFIXES):
+            return False
+
+        # GitLab: massive trap with thousands of auto-generated pages
+        # Each repo has issues, merge requests, forks, branches, commits, etc.
+        # Mostly boilerplate UI with minimal unique content
+        if "gitlab" in hostname:
             return False
 
         path_lower = parsed.path.lower()
+
+        # Non-HTML file extensions: no extractable links, waste of crawl budget
+        # Categories: web assets, media, documents, archives, binaries,
+        # source code. The extension is the suffix after the last "."
+        # in the last path segment; a "." in an earlier segment doesn't
+        # count.
+        dot = path_lower.rfind(".")
+        if dot > path_lower.rfind("/") and path_lower[dot + 1:] in _BAD_EXTS:
+            return False
+
         query_lower = (parsed.query or "").lower()
 
         # ====================================================================
         # QUERY STRING TRAPS
         # ====================================================================
 
-        # WordPress comment/share links: infinite variations of same content
-        # ?replytocom=123, ?share=twitter, etc.
-        if "replytocom=" in query_lower or "share=" in query_lower:
-            return False
-
-        # oEmbed and XML format endpoints: return metadata, not HTML
-        if "oembed" in query_lower or "format=xml" in query_lower:
-            return False
-
-        # DokuWiki action parameters: combinatorial explosion
-        # Examples: do=media, do=revisions, tab_files=1, tab_details=1
-        dokuwiki_params = [
-            "do=media", "tab_files=", "tab_details=",
-            "do=revisions", "do=backlink", "do=recent", "do=index"
-        ]
-        if any(param in query_lower for param in dokuwiki_params):
-            return False
-
-        # WordPress faceted filtering: creates exponential URL combinations
-        # Examples: filter[category]=x, filter%5btag%5d=y
-        if "filter%5b" in query_lower or "filter[" in query_lower:
+        # WordPress comment/share/oEmbed/faceted-filter links and
+        # DokuWiki action parameters (see _QUERY_TRAPS_RE for the list)
+        if query_lower and _QUERY_TRAPS_RE.search(query_lower):
             return False
 
         # ====================================================================
         # PATH-BASED FILTERS
         # ====================================================================
 
-        # RSS/Atom feeds: XML syndication, not HTML
-        # WordPress exposes /feed on every post and category
-        if path_lower.endswith("/feed") or "/feed/" in path_lower:
-            return False
-
-        # XML files: sitemaps, feeds, config files (not HTML)
-        if path_lower.endswith(".xml"):
-            return False
-
-        # WordPress API and uploads: non-HTML content
-        # /wp-json/ = REST API (returns JSON)
-        # /wp-content/uploads/ = media files (no links)
-        bad_paths = ["/wp-json/", "/wp-content/uploads/"]
-        if any(path in path_lower for path in bad_paths):
-            return False
-
-        # GitLab: massive trap with thousands of auto-generated pages
-        # Each repo has issues, merge requests, forks, branches, commits, etc.
-        # Mostly boilerplate UI with minimal unique content
-        if "gitlab" in (parsed.hostname or "").lower():
-            return False
-
-        # Non-HTML file extensions: no extractable links, waste of crawl budget
-        # Categories: web assets, media, documents, archives, binaries, source code
-        if re.match(
-            r".*\.("
-            r"css|js|bmp|gif|jpe?g|ico|png|tiff?|"  # Web assets & images
-            r"mid|mp2|mp3|mp4|wav|avi|mov|mpeg|ram|m4v|mkv|ogg|ogv|"  # Media
-            r"pdf|ps|eps|tex|ppt|pptx|doc|docx|xls|xlsx|"  # Documents
-            r"zip|rar|gz|bz2|tar|7z|tgz|"  # Archives
-            r"exe|msi|bin|dll|dmg|iso|apk|"  # Binaries
-            r"c|cc|cpp|h|hpp|java|py|r|m|mat|o|"  # Source code
-            r"names|data|dat|psd|epub|cnf|sha1|thmx|mso|arff|rtf|jar|csv|"  # Data
-            r"rm|smil|wmv|swf|wma|img|sql|ppsx|odc|war|db|lif|"  # Misc
-            # r"ova|vmdk|vdi|qcow2"  # VM images
-            r")$",
-            path_lower,
-        ):
+        # Feeds, XML files, the WP REST API and media uploads: none of
+        # these serve crawlable HTML (see _PATH_TRAPS_RE for the list)
+        if _PATH_TRAPS_RE.search(path_lower):
             return False
 
         # ====================================================================
@@ -603,8 +875,8 @@ def is_valid(url):
 
         # Calendar/event pages: infinite date combinations
         # Example: /calendar/2023-01/, /calendar/2023-02/, etc.
-        if re.search(r"(calendar|date|event)", path_lower) and \
-           re.search(r"\d{4}[-/]\d{2}", parsed.path):
+        if _CALENDAR_WORD_RE.search(path_lower) and \
+           _CALENDAR_DATE_RE.search(parsed.path):
             return False
 
         # Recursive path segments: infinite depth loops
@@ -612,11 +884,6 @@ def is_valid(url):
         if path_lower.count("seminar-series") > 1:
             return False
 
-        # Extremely long URLs: usually dynamically generated traps
-        # Legitimate content pages rarely exceed 200 characters
-        if len(url) > 200:
-            return False
-
         # Path depth and loop detection
         path_segments = [seg for seg in parsed.path.split("/") if seg]
         # Too deep: > 10 directory levels
@@ -628,12 +895,14 @@ def is_valid(url):
 
         # Apache directory listing sort parameters
         # Example: ?C=N;O=A (column and order combinations)
-        if re.search(r"(^|[&;])(C|O)=", parsed.query):
+        if _APACHE_SORT_RE.search(parsed.query):
             return False
 
         # Authentication and action pages: often cause redirect loops
-        # Examples: wp-login, wp-admin, action=delete, etc.
-        if re.search(r"(login|logout|wp-admin|wp-login|action=)", url.lower()):
+        # Examples: wp-login, wp-admin, action=delete, etc. The path
+        # and query are already lowercased above; joining them avoids
+        # re-lowercasing the whole URL.
+        if _AUTH_RE.search(path_lower + "?" + query_lower):
             return False
 
         return True
@@ -1,7 +1,21 @@
 import os
 import logging
-from hashlib import sha256
-from urllib.parse import urlparse
+from hashlib import blake2b
+
+try:
+    # C-implemented reentrant lock with a much cheaper uncontended
+    # acquire/release than threading.RLock; optional dependency.
+    from fastrlock.rlock import FastRLock
+except ImportError:
+    from threading import RLock as FastRLock
+
+try:
+    # Non-cryptographic hash, several times faster than the hashlib
+    # digests on short strings; optional dependency.
+    from xxhash import xxh64_hexdigest as _hexdigest
+except ImportError:
+    def _hexdigest(data):
+        return blake2b(data, digest_size=8).hexdigest()
 
 def get_logger(name, filename=None):
     logger = logging.getLogger(name)
@@ -23,11 +37,11 @@ def get_logger(name, filename=None):
 
 
 def get_urlhash(url):
-    parsed = urlparse(url)
-    # everything other than scheme.
-    return sha256(
-        f"{parsed.netloc}/{parsed.path}/{parsed.params}/"
-        f"{parsed.query}/{parsed.fragment}".encode("utf-8")).hexdigest()
+    # everything other than scheme, hashed directly without re-parsing
+    # and reassembling the URL.
+    scheme_end = url.find("://")
+    key = url[scheme_end + 3:] if scheme_end >= 0 else url
+    return _hexdigest(key.encode("utf-8"))
 
 def normalize(url):
     if url.endswith("/"):
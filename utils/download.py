@@ -1,12 +1,28 @@
+import threading
+
 import requests
 import cbor
 import time
 
 from utils.response import Response
 
+# One long-lived Session per worker thread: keep-alive connections to the
+# cache server avoid a fresh TCP handshake per download. requests.Session
+# is not guaranteed thread-safe, hence thread-local storage rather than a
+# shared module-level session.
+_local = threading.local()
+
+
+def _get_session():
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session
+
+
 def download(url, config, logger=None):
     host, port = config.cache_server
-    resp = requests.get(
+    resp = _get_session().get(
         f"http://{host}:{port}/",
         params=[("q", f"{url}"), ("u", f"{config.user_agent}")])
     try: